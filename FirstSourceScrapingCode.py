@@ -1,34 +1,186 @@
 import os
-import glob
-import pandas as pd
+import csv
+import multiprocessing
+import pickle
+import shutil
+import codecs
+import errno
+import json
+import re
+import functools
+import logging
+import logging.handlers
+import threading
 import time
-from datetime import datetime
+import pyarrow as pa
+from pyarrow import csv as pacsv
+import polars as pl
+import requests
+from urllib.parse import urljoin
 from selenium import webdriver
 from selenium.webdriver.edge.service import Service
 from webdriver_manager.microsoft import EdgeChromiumDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import Select
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from multiprocessing.util import Finalize
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
 
 
-def setup_driver(download_directory):
+SEARCH_URL = "https://firstsource.cmie.com/kommon/bin/sr.php?kall=wadvsearch"
+
+# Resources that carry no data, blocked in headless drivers to shorten page loads
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf",
+    "*google-analytics*", "*googletagmanager*", "*doubleclick*",
+]
+
+EXPORT_LINK_XPATH = "//a[contains(@id, 'exporttocsv_') and contains(text(), 'Export to CSV')]"
+
+# The message a search with no matching companies shows in place of the results table
+NO_RESULTS_XPATH = (
+    "//*[contains(translate(normalize-space(text()), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'no record')"
+    " or contains(translate(normalize-space(text()), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'no data')"
+    " or contains(translate(normalize-space(text()), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'no results')]"
+)
+
+# Anything that is not a letter, digit or underscore
+_UNSAFE_FILENAME_RE = re.compile(r'\W+')
+
+logger = logging.getLogger("scrape")
+
+# Per-process state, populated by _init_worker in each pool worker
+_worker_driver = None
+_worker_directory = None
+_download_directory = None
+_cookies_path = None
+_driver_path = None
+_search_form_stale = True
+
+
+def resolve_driver_path():
+    """Returns the EdgeDriver binary path, preferring a pre-installed EDGE_DRIVER_PATH."""
+    return os.environ.get("EDGE_DRIVER_PATH") or EdgeChromiumDriverManager().install()
+
+
+def setup_driver(download_directory, headless=True, driver_path=None):
     """Initializes the WebDriver with specific download settings for Edge."""
     edge_options = webdriver.EdgeOptions()
-    edge_options.add_argument("--start-maximized")
+    if headless:
+        edge_options.add_argument("--headless=new")
+        edge_options.add_argument("--window-size=1920,1080")
+        edge_options.add_argument("--disable-gpu")
+        edge_options.add_argument("--disable-dev-shm-usage")
+        edge_options.add_argument("--blink-settings=imagesEnabled=false")
+    else:
+        edge_options.add_argument("--start-maximized")
+    # Return control once the DOM is ready instead of waiting for every asset
+    edge_options.page_load_strategy = "eager"
     edge_options.add_experimental_option("prefs", {
         "download.default_directory": download_directory,
         "download.prompt_for_download": False,
         "download.directory_upgrade": True,
         "safebrowsing.enabled": True
     })
-    return webdriver.Edge(service=Service(EdgeChromiumDriverManager().install()), options=edge_options)
+    driver = webdriver.Edge(service=Service(driver_path or resolve_driver_path()), options=edge_options)
+    if headless:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return driver
 
 
 def safe_print(*args):
-    """Thread-safe print function."""
-    print(*args)
+    """Logs a message through the queue-backed scrape logger."""
+    logger.info(" ".join(map(str, args)))
+
+
+def attach_log_queue(log_queue):
+    """Sends this process's scrape log records to the shared logging queue."""
+    logger.setLevel(logging.INFO)
+    logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    logger.propagate = False
+
+
+def start_logging(log_path):
+    """Starts a background listener that writes queued log records to the console and a rotating file."""
+    log_queue = multiprocessing.Queue()
+    formatter = logging.Formatter('%(asctime)s %(processName)s %(message)s')
+    console_handler = logging.StreamHandler()
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_path, maxBytes=50_000_000, backupCount=5, encoding='utf-8'
+    )
+    for handler in (console_handler, file_handler):
+        handler.setFormatter(formatter)
+
+    listener = logging.handlers.QueueListener(log_queue, console_handler, file_handler)
+    listener.start()
+    attach_log_queue(log_queue)
+    return log_queue, listener
+
+
+def save_cookies(driver, cookies_path):
+    """Saves the logged-in session cookies to disk."""
+    with open(cookies_path, 'wb') as f:
+        pickle.dump(driver.get_cookies(), f)
+
+
+def load_cookies(driver, cookies_path):
+    """Restores saved session cookies into a fresh driver."""
+    driver.get(SEARCH_URL)
+    with open(cookies_path, 'rb') as f:
+        for cookie in pickle.load(f):
+            driver.add_cookie(cookie)
+    driver.get(SEARCH_URL)
+
+
+def is_logged_in(driver, timeout=10):
+    """Checks whether the current session can reach the advanced search form."""
+    try:
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.ID, "frm_submit")))
+        return True
+    except TimeoutException:
+        return False
+
+
+def ensure_login(download_directory, cookies_path, driver_path=None):
+    """Reuses saved session cookies if still valid, otherwise prompts for a manual login."""
+    if os.path.exists(cookies_path):
+        driver = setup_driver(download_directory, driver_path=driver_path)
+        try:
+            load_cookies(driver, cookies_path)
+            if is_logged_in(driver):
+                safe_print("Reusing saved session cookies.")
+                return
+            safe_print("Saved session cookies have expired.")
+        finally:
+            driver.quit()
+
+    driver = setup_driver(download_directory, headless=False, driver_path=driver_path)
+    try:
+        driver.get(SEARCH_URL)
+        input("Press Enter after you've logged in...")
+        save_cookies(driver, cookies_path)
+    finally:
+        driver.quit()
+
+
+def load_manifest(progress_path):
+    """Loads the progress manifest of completed state/business combinations."""
+    if os.path.exists(progress_path):
+        with open(progress_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"done": []}
+
+
+def save_manifest(manifest, progress_path):
+    """Writes the progress manifest atomically so a crash cannot truncate it."""
+    temp_path = progress_path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, progress_path)
 
 
 def create_directory(path):
@@ -37,11 +189,10 @@ def create_directory(path):
         os.makedirs(path)
 
 
+@functools.lru_cache(maxsize=256)
 def format_filename(text):
     """Converts text to a filename-friendly format."""
-    formatted = text.replace(' ', '_').replace('&', 'and')
-    formatted = ''.join(c for c in formatted if c.isalnum() or c == '_')
-    return formatted
+    return _UNSAFE_FILENAME_RE.sub('', text.replace(' ', '_').replace('&', 'and'))
 
 
 def rename_downloaded_file(download_directory, state_name, business_type=None, page_number=None):
@@ -49,13 +200,13 @@ def rename_downloaded_file(download_directory, state_name, business_type=None, p
     downloaded_file_path = os.path.join(download_directory, 'data.csv')
     if os.path.exists(downloaded_file_path):
         state_formatted = format_filename(state_name)
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
         
+        # Zero-padded so that lexical order is page order
         if business_type:
             business_formatted = format_filename(business_type)
-            new_filename = f"{state_formatted}_{business_formatted}_page_{page_number}.csv"
+            new_filename = f"{state_formatted}_{business_formatted}_page_{page_number:06d}.csv"
         else:
-            new_filename = f"{state_formatted}_{timestamp}.csv"
+            new_filename = f"{state_formatted}_page_{page_number:06d}.csv"
             
         new_file_path = os.path.join(download_directory, new_filename)
         os.rename(downloaded_file_path, new_file_path)
@@ -66,30 +217,99 @@ def rename_downloaded_file(download_directory, state_name, business_type=None, p
         return None
 
 
-def move_files_to_directory(download_directory, state_name, business_type=None):
+def _list_csvs(dir_path, prefix='', suffix='.csv'):
+    """Lists matching files in a single directory pass."""
+    try:
+        with os.scandir(dir_path) as it:
+            return [e.path for e in it if e.name.startswith(prefix) and e.name.endswith(suffix) and e.is_file()]
+    except FileNotFoundError:
+        return []
+
+
+def _move(src, dst):
+    """Moves a file with os.replace, falling back to shutil.move across filesystems."""
+    # A saved page is never silently replaced by another one with the same name
+    if os.path.exists(dst):
+        raise FileExistsError(errno.EEXIST, "Target file already exists", dst)
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
+
+
+def move_files_to_directory(download_directory, state_name, business_type=None, source_directory=None):
     """Moves CSV files to appropriate directory structure."""
     state_formatted = format_filename(state_name)
+    source_directory = source_directory or download_directory
     
     if business_type:
         business_formatted = format_filename(business_type)
         target_directory = os.path.join(download_directory, f"{state_formatted}_{business_formatted}")
-        file_pattern = f"{state_formatted}_{business_formatted}_page_*.csv"
+        file_prefix = f"{state_formatted}_{business_formatted}_page_"
     else:
         target_directory = os.path.join(download_directory, state_formatted)
-        file_pattern = f"{state_formatted}_*.csv"
+        file_prefix = f"{state_formatted}_page_"
     
     create_directory(target_directory)
-    csv_files = glob.glob(os.path.join(download_directory, file_pattern))
+    csv_files = _list_csvs(source_directory, file_prefix)
     
     for file_path in csv_files:
         try:
             destination_path = os.path.join(target_directory, os.path.basename(file_path))
-            os.rename(file_path, destination_path)
+            _move(file_path, destination_path)
             safe_print(f"Moved file to {target_directory}: {os.path.basename(file_path)}")
         except Exception as e:
             safe_print(f"Error moving file {file_path}: {e}")
 
 
+def read_csv_header(file_path):
+    """Returns the raw header line of a CSV file without BOM or line ending."""
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+    if header.startswith(codecs.BOM_UTF8):
+        header = header[len(codecs.BOM_UTF8):]
+    return header.rstrip(b'\r\n')
+
+
+def append_csv_files(csv_files, output_path):
+    """Appends CSV files byte-for-byte into one file, keeping only the first header."""
+    with open(output_path, 'wb') as dst:
+        needs_newline = False
+        for index, file_path in enumerate(csv_files):
+            with open(file_path, 'rb') as src:
+                if index:
+                    src.readline()
+                start = src.tell()
+                end = src.seek(0, os.SEEK_END)
+                if end == start:
+                    continue
+                src.seek(end - 1)
+                ends_with_newline = src.read(1) == b'\n'
+                src.seek(start)
+
+                # Guard against a previous file that had no trailing newline
+                if needs_newline:
+                    dst.write(b'\n')
+                shutil.copyfileobj(src, dst, length=1 << 20)
+                needs_newline = not ends_with_newline
+
+
+def read_csv_table(file_path):
+    """Reads a CSV file into an Arrow table with multi-threaded parsing, skipping bad rows."""
+    # Every column is read as text, so values such as "N.A." survive and pages whose
+    # types would infer differently still concatenate
+    column_names = next(csv.reader([read_csv_header(file_path).decode('utf-8')]), [])
+    column_types = {name: pa.string() for name in column_names}
+    return pacsv.read_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=1 << 20),
+        parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: 'skip'),
+        convert_options=pacsv.ConvertOptions(column_types=column_types),
+    )
+
+
 def combine_csv_files(download_directory, state_name, business_type=None):
     """Combines CSV files into a single file."""
     state_formatted = format_filename(state_name)
@@ -97,43 +317,53 @@ def combine_csv_files(download_directory, state_name, business_type=None):
     if business_type:
         business_formatted = format_filename(business_type)
         directory_path = os.path.join(download_directory, f"{state_formatted}_{business_formatted}")
-        file_pattern = f"{state_formatted}_{business_formatted}_page_*.csv"
+        file_prefix = f"{state_formatted}_{business_formatted}_page_"
         output_filename = f"{state_formatted}_{business_formatted}_combined.csv"
     else:
         directory_path = os.path.join(download_directory, state_formatted)
-        file_pattern = f"{state_formatted}_*.csv"
+        file_prefix = f"{state_formatted}_page_"
         output_filename = f"{state_formatted}_combined.csv"
 
-    csv_files = glob.glob(os.path.join(directory_path, file_pattern))
-    if business_type:
-        csv_files.sort(key=lambda x: int(x.split('page_')[-1].split('.')[0]))
-    else:
-        csv_files.sort(key=os.path.getmtime, reverse=True)
+    csv_files = _list_csvs(directory_path, file_prefix)
+    csv_files.sort()
+    csv_files = [f for f in csv_files
+                 if os.path.basename(f) != output_filename and os.path.getsize(f) > 0]
 
-    combined_df = pd.DataFrame()
-    for file_path in csv_files:
-        try:
-            df = pd.read_csv(file_path, encoding='utf-8', on_bad_lines='skip')
-            combined_df = pd.concat([combined_df, df], ignore_index=True)
-        except Exception as e:
-            safe_print(f"Error processing {file_path}: {e}")
+    if not csv_files:
+        safe_print(f"No data to combine for {output_filename}")
+        return
 
-    if not combined_df.empty:
-        combined_file_path = os.path.join(directory_path, output_filename)
-        combined_df.to_csv(combined_file_path, index=False, encoding='utf-8')
-        safe_print(f"Created combined CSV file: {combined_file_path}")
+    combined_file_path = os.path.join(directory_path, output_filename)
+    if len({read_csv_header(f) for f in csv_files}) == 1:
+        # Same columns everywhere, so the files can be appended without parsing them
+        append_csv_files(csv_files, combined_file_path)
     else:
-        safe_print(f"No data to combine for {output_filename}")
+        safe_print(f"Column sets differ for {output_filename}, combining with pyarrow")
+        tables = []
+        for file_path in csv_files:
+            try:
+                tables.append(read_csv_table(file_path))
+            except Exception as e:
+                safe_print(f"Error processing {file_path}: {e}")
+        table = pa.concat_tables(tables, promote_options="default") if tables else None
+
+        if table is None or not table.num_rows:
+            safe_print(f"No data to combine for {output_filename}")
+            return
+        # Arrow's C++ writer formats in batches, without a DataFrame round-trip
+        pacsv.write_csv(table, combined_file_path,
+                        write_options=pacsv.WriteOptions(include_header=True, batch_size=1 << 16))
+    safe_print(f"Created combined CSV file: {combined_file_path}")
 
 
 def consolidate_state_files(download_directory, state_name):
     """Consolidates all combined CSV files for a state across business types."""
     state_formatted = format_filename(state_name)
-    combined_df = pd.DataFrame()
+    frames = []
 
     # Search for all business type folders for the state
-    state_directory_pattern = os.path.join(download_directory, f"{state_formatted}_*")
-    business_type_folders = glob.glob(state_directory_pattern)
+    with os.scandir(download_directory) as it:
+        business_type_folders = [e.path for e in it if e.name.startswith(f"{state_formatted}_") and e.is_dir()]
 
     if not business_type_folders:
         safe_print(f"No business type folders found for state: {state_formatted}")
@@ -143,100 +373,348 @@ def consolidate_state_files(download_directory, state_name):
 
     for folder in business_type_folders:
         safe_print(f"Processing folder: {folder}")
-        combined_files = glob.glob(os.path.join(folder, "*_combined.csv"))
+        combined_files = _list_csvs(folder, suffix="_combined.csv")
         
         for file_path in combined_files:
             try:
-                df = pd.read_csv(file_path, encoding='utf-8', on_bad_lines='skip')
-                combined_df = pd.concat([combined_df, df], ignore_index=True)
-                safe_print(f"Processed: {file_path}")
+                # Text columns keep values such as "N.A." that type inference would turn into nulls
+                frame = pl.scan_csv(file_path, infer_schema=False, encoding="utf8-lossy",
+                                    truncate_ragged_lines=True)
+                # Reading the header here keeps one unreadable file from failing the whole state
+                frame.collect_schema()
+                frames.append(frame)
+                safe_print(f"Scanning: {file_path}")
             except Exception as e:
                 safe_print(f"Error processing {file_path}: {e}")
 
-    if not combined_df.empty:
-        consolidated_file_path = os.path.join(download_directory, f"{state_formatted}_consolidated.csv")
-        combined_df.to_csv(consolidated_file_path, index=False, encoding='utf-8')
-        safe_print(f"Created consolidated CSV file: {consolidated_file_path}")
-    else:
+    if not frames:
         safe_print(f"No data to consolidate for state: {state_formatted}")
+        return
+
+    # Lazy scans streamed straight to Parquet, so no input file is ever fully materialized
+    consolidated_file_path = os.path.join(download_directory, f"{state_formatted}_consolidated.parquet")
+    try:
+        consolidated = pl.concat(frames, how="diagonal_relaxed")
+        # The same company can appear under several business types or on overlapping pages.
+        # Unordered unique streams, but still holds one hash entry per distinct key (or row).
+        if "CIN" in consolidated.collect_schema().names():
+            # unique() would treat every row without a CIN as the same company, so those
+            # rows are only deduplicated as whole rows
+            consolidated = pl.concat([
+                consolidated.filter(pl.col("CIN").is_not_null()).unique(subset=["CIN"], keep="any"),
+                consolidated.filter(pl.col("CIN").is_null()).unique(keep="any"),
+            ])
+        else:
+            consolidated = consolidated.unique(keep="any")
+        consolidated.sink_parquet(consolidated_file_path, compression='snappy')
+        safe_print(f"Created consolidated Parquet file: {consolidated_file_path}")
+    except Exception as e:
+        safe_print(f"Error consolidating files for state {state_formatted}: {e}")
+
+
+SELECT_BY_TEXT_JS = """
+var select = arguments[0];
+for (var i = 0; i < select.options.length; i++) {
+    if (select.options[i].text.trim() === arguments[1]) {
+        select.selectedIndex = i;
+        select.dispatchEvent(new Event('change', {bubbles: true}));
+        return true;
+    }
+}
+return false;
+"""
+
+
+def select_by_visible_text(driver, select_element, text):
+    """Selects a dropdown option by visible text in a single script round-trip."""
+    if not driver.execute_script(SELECT_BY_TEXT_JS, select_element, text):
+        raise NoSuchElementException(f"Cannot locate option with text: {text}")
+
+
+def return_to_search_form(driver, timeout=10):
+    """Goes back to the search form through the page's own New Search link, if it has one."""
+    new_search_links = driver.find_elements(By.XPATH, "//a[contains(text(), 'New Search')]")
+    if not new_search_links:
+        return False
+    driver.execute_script("arguments[0].click();", new_search_links[0])
+    try:
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.ID, "frm_submit")))
+        return True
+    except TimeoutException:
+        return False
+
+
+def open_search_form(driver, reload=False):
+    """Loads a fresh search form, unless reload is False and the driver is already showing one."""
+    if reload or not driver.find_elements(By.ID, "frm_submit"):
+        driver.get(SEARCH_URL)
+
+
+def session_from_driver(driver):
+    """Builds a requests session that carries the driver's cookies and user agent."""
+    session = requests.Session()
+    session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie['name'], cookie['value'],
+                            domain=cookie.get('domain'), path=cookie.get('path', '/'))
+    return session
 
 
-def download_and_process_data(driver, download_directory, state_name, business_type=None):
-    """Handles the download and processing of data for a state/business combination."""
+def export_url_of(driver, export_link):
+    """Returns the absolute URL an export link points to, or None if it is script-driven."""
+    # The DOM attribute, unlike the href property, still shows "#" and "javascript:" links as such
+    href = (export_link.get_dom_attribute("href") or "").strip()
+    if not href or href.startswith("#") or href.lower().startswith("javascript:"):
+        return None
+    return urljoin(driver.current_url, href)
+
+
+def fetch_export(session, export_url, downloaded_file_path, timeout=60):
+    """Downloads an export over plain HTTP; returns False if the server did not send a file."""
+    if not export_url or not export_url.startswith("http"):
+        return False
+    partial_path = downloaded_file_path + ".part"
+    try:
+        with session.get(export_url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            # An HTML response means the link is script-driven or the session was rejected
+            if 'text/html' in response.headers.get('Content-Type', ''):
+                return False
+            response.raw.decode_content = True
+            with open(partial_path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=1 << 20)
+    except (requests.RequestException, OSError) as e:
+        safe_print(f"Direct export download failed, falling back to the browser: {e}")
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        return False
+    os.replace(partial_path, downloaded_file_path)
+    return True
+
+
+class DownloadWatcher(FileSystemEventHandler):
+    """Signals when a finished data.csv download lands in the watched directory."""
+
+    def __init__(self, filename='data.csv'):
+        super().__init__()
+        self.filename = filename
+        self.ready = threading.Event()
+
+    def _check(self, path):
+        if os.path.basename(path) == self.filename:
+            self.ready.set()
+
+    def on_moved(self, event):
+        # Edge writes data.csv.crdownload and renames it once the download is complete
+        self._check(event.dest_path)
+
+    def on_closed(self, event):
+        self._check(event.src_path)
+
+
+def saved_pages(download_directory, state_name, business_type=None):
+    """Returns the page numbers already saved for a state/business combination."""
+    state_formatted = format_filename(state_name)
+    if business_type:
+        business_formatted = format_filename(business_type)
+        directory_path = os.path.join(download_directory, f"{state_formatted}_{business_formatted}")
+        file_prefix = f"{state_formatted}_{business_formatted}_page_"
+    else:
+        directory_path = os.path.join(download_directory, state_formatted)
+        file_prefix = f"{state_formatted}_page_"
+    pages = set()
+    for path in _list_csvs(directory_path, file_prefix):
+        page = os.path.basename(path)[len(file_prefix):-len('.csv')]
+        if page.isdigit():
+            pages.add(int(page))
+    return pages
+
+
+def download_and_process_data(driver, download_directory, state_name, business_type=None, staging_directory=None):
+    """Downloads and processes a state/business combination, returning its page count (0 for no results)."""
+    staging_directory = staging_directory or download_directory
+    downloaded_file_path = os.path.join(staging_directory, 'data.csv')
+    # A data.csv left behind by a failed task would otherwise be saved as this task's page
+    if os.path.exists(downloaded_file_path):
+        os.remove(downloaded_file_path)
+    watcher = DownloadWatcher()
+    observer = Observer()
+    observer.schedule(watcher, staging_directory, recursive=False)
+    observer.start()
     try:
         if business_type:
             category_tab = WebDriverWait(driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//a[@class='nav-link' and @href='#category']"))
             )
             category_tab.click()
-            time.sleep(2)
 
-            business_select = Select(driver.find_element(By.ID, "nature_of_business"))
-            business_select.select_by_visible_text(business_type)
-            time.sleep(2)
+            business_select = WebDriverWait(driver, 15).until(
+                EC.visibility_of_element_located((By.ID, "nature_of_business"))
+            )
+            select_by_visible_text(driver, business_select, business_type)
 
         location_tab = WebDriverWait(driver, 10).until(
             EC.element_to_be_clickable((By.XPATH, "//a[@class='nav-link' and @href='#location']"))
         )
         location_tab.click()
-        time.sleep(2)
 
-        state_select = Select(driver.find_element(By.ID, "state_name"))
-        state_select.select_by_visible_text(state_name)
-        time.sleep(2)
+        state_select = WebDriverWait(driver, 15).until(
+            EC.visibility_of_element_located((By.ID, "state_name"))
+        )
+        select_by_visible_text(driver, state_select, state_name)
 
         submit_button = WebDriverWait(driver, 5).until(
             EC.element_to_be_clickable((By.ID, "frm_submit"))
         )
         submit_button.click()
 
+        # A search without matches never shows an export link, so tell it apart from a slow page
+        WebDriverWait(driver, 30).until(EC.any_of(
+            EC.element_to_be_clickable((By.XPATH, EXPORT_LINK_XPATH)),
+            EC.visibility_of_element_located((By.XPATH, NO_RESULTS_XPATH)),
+        ))
+        if not driver.find_elements(By.XPATH, EXPORT_LINK_XPATH):
+            safe_print(f"Search returned no results for {state_name} - {business_type or 'all businesses'}")
+            return_to_search_form(driver)
+            return 0
+
+        # Pages saved by an earlier, interrupted run only need to be paged past
+        pages_to_skip = saved_pages(download_directory, state_name, business_type)
+        # Exports are fetched over HTTP with the browser's session until that stops working
+        session = session_from_driver(driver)
         page_number = 1
+        pages_saved = 0
         while True:
+            export_csv_link = WebDriverWait(driver, 30).until(
+                EC.element_to_be_clickable((By.XPATH, EXPORT_LINK_XPATH))
+            )
+            if page_number in pages_to_skip:
+                safe_print(f"Page {page_number} already saved, skipping export.")
+            else:
+                export_url = export_url_of(driver, export_csv_link)
+                if not (session and fetch_export(session, export_url, downloaded_file_path)):
+                    session = None
+                    if os.path.exists(downloaded_file_path):
+                        os.remove(downloaded_file_path)
+                    watcher.ready.clear()
+                    export_csv_link.click()
+
+                    # Only the watcher's event proves the file came from this click
+                    if not watcher.ready.wait(timeout=40):
+                        raise TimeoutException("Timed out waiting for data.csv to download")
+                rename_downloaded_file(staging_directory, state_name, business_type, page_number)
+                # Moving each page right away makes it a checkpoint for saved_pages
+                move_files_to_directory(download_directory, state_name, business_type, staging_directory)
+            pages_saved += 1
+
+            # Only a missing Next button means the results are exhausted; any other
+            # failure propagates so the combination stays pending in the manifest
             try:
-                time.sleep(5)
-                export_csv_link = WebDriverWait(driver, 30).until(
-                    EC.element_to_be_clickable((By.XPATH, "//a[contains(@id, 'exporttocsv_') and contains(text(), 'Export to CSV')]"))
-                )
-                export_csv_link.click()
-
-                WebDriverWait(driver, 40).until(
-                    lambda d: os.path.exists(os.path.join(download_directory, 'data.csv'))
-                )
-                rename_downloaded_file(download_directory, state_name, business_type, page_number)
-
                 next_button = WebDriverWait(driver, 30).until(
                     EC.element_to_be_clickable((By.XPATH, "//input[@class='img_but_next']"))
                 )
-                driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
-                time.sleep(1)
-
-                try:
-                    overlay = WebDriverWait(driver, 3).until(
-                        EC.visibility_of_element_located((By.CSS_SELECTOR, "a.nav-link.dropdown-toggle"))
-                    )
-                    overlay.click()
-                    time.sleep(1)
-                except (TimeoutException, NoSuchElementException):
-                    pass
-
-                driver.execute_script("arguments[0].click();", next_button)
-                time.sleep(5)
-                page_number += 1
-                WebDriverWait(driver, 20).until(EC.staleness_of(next_button))
-            except Exception as e:
-                safe_print(f"Navigation ended. Moving to next combination. Error: {e}")
+            except TimeoutException:
+                safe_print(f"No next page after page {page_number}. Moving to next combination.")
                 break
+            driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
 
-        move_files_to_directory(download_directory, state_name, business_type)
+            try:
+                overlay = WebDriverWait(driver, 3).until(
+                    EC.visibility_of_element_located((By.CSS_SELECTOR, "a.nav-link.dropdown-toggle"))
+                )
+                overlay.click()
+            except (TimeoutException, NoSuchElementException):
+                pass
+
+            driver.execute_script("arguments[0].click();", next_button)
+            page_number += 1
+            WebDriverWait(driver, 20).until(EC.staleness_of(next_button))
+
+        move_files_to_directory(download_directory, state_name, business_type, staging_directory)
         combine_csv_files(download_directory, state_name, business_type)
 
+        # Saves a cold page load for the next combination; open_search_form falls back to one
+        return_to_search_form(driver)
+        return pages_saved
+
     except Exception as e:
         safe_print(f"Error in download_and_process_data: {e}")
         raise
+    finally:
+        observer.stop()
+        observer.join()
+
+
+def _start_worker_driver():
+    """Starts this worker's driver and logs it in, leaving it unset if either step fails."""
+    global _worker_driver
+    driver = setup_driver(_worker_directory, driver_path=_driver_path)
+    try:
+        load_cookies(driver, _cookies_path)
+    except Exception:
+        driver.quit()
+        raise
+    Finalize(None, driver.quit, exitpriority=10)
+    _worker_driver = driver
+
+
+def _init_worker(download_directory, cookies_path, driver_path, log_queue):
+    """Starts a logged-in driver with its own download directory for a pool worker."""
+    global _worker_directory, _download_directory, _cookies_path, _driver_path
+    attach_log_queue(log_queue)
+    _download_directory = download_directory
+    _cookies_path = cookies_path
+    _driver_path = driver_path
+    # A per-process directory keeps concurrent 'data.csv' downloads from colliding
+    _worker_directory = os.path.join(download_directory, f"worker_{os.getpid()}")
+    create_directory(_worker_directory)
+    # An initializer that raises makes the pool respawn workers forever, so
+    # _process_one retries the start instead
+    try:
+        _start_worker_driver()
+    except Exception as e:
+        safe_print(f"Worker driver failed to start: {e}")
+
+
+def _process_one(state, business_type):
+    """Processes a single state/business combination on this worker's driver."""
+    global _search_form_stale
+    label = f"{state} - {business_type}" if business_type else state
+    if _worker_driver is None:
+        try:
+            _start_worker_driver()
+        except Exception as e:
+            safe_print(f"Skipping {label}, worker driver failed to start again: {e}")
+            # Back off so a broken worker cannot drain the task queue ahead of the healthy ones
+            time.sleep(60)
+            return False
+    try:
+        # Whole-state tasks never touch the business type select, so they need a form
+        # without a previous task's selection; so does anything after a failed task
+        open_search_form(_worker_driver, reload=_search_form_stale or business_type is None)
+        _search_form_stale = True
+        pages_saved = download_and_process_data(_worker_driver, _download_directory, state, business_type, _worker_directory)
+        _search_form_stale = False
+        if pages_saved:
+            safe_print(f"Completed processing {label}")
+        else:
+            safe_print(f"No results for {label}, marking it done")
+        return True
+    except Exception as e:
+        safe_print(f"Error processing {label}: {e}")
+        return False
+
+
+def _process_task(task):
+    """Runs _process_one for a (state, business_type) task and reports how it went."""
+    return task, _process_one(*task)
 
 
 def main():
     download_directory = r"D:\Downloads"
+    cookies_path = os.path.join(download_directory, "cookies.pkl")
+    progress_path = os.path.join(download_directory, "progress.json")
+    num_workers = 4
 
     # States that need business type filtering
     business_filtered_states = [
@@ -275,51 +753,49 @@ def main():
         "Transport, storage and Communications"
     ]
 
-    driver = setup_driver(download_directory)
-    driver.get("https://firstsource.cmie.com/kommon/bin/sr.php?kall=wadvsearch")
-    input("Press Enter after you've logged in...")
-
+    create_directory(download_directory)
+    log_queue, listener = start_logging(os.path.join(download_directory, "scrape.log"))
     try:
-        # Process states that need business type filtering
+        # Resolve the driver once rather than once per worker process
+        driver_path = resolve_driver_path()
+
+        # Log in once (or reuse the last run's session); workers share it through saved cookies
+        ensure_login(download_directory, cookies_path, driver_path)
+
+        # Skip "Business Services" for Maharashtra
+        tasks = [
+            (state, business_type)
+            for state in business_filtered_states
+            for business_type in business_types
+            if not (state == "Maharashtra" and business_type == "Business Services")
+        ]
+        tasks += [(state, None) for state in other_states]
+
+        # Skip combinations finished by a previous run
+        manifest = load_manifest(progress_path)
+        done = {tuple(pair) for pair in manifest["done"]}
+        tasks = [task for task in tasks if task not in done]
+
+        safe_print(f"\nProcessing {len(tasks)} combinations with {num_workers} workers...")
+        with multiprocessing.Pool(processes=num_workers, initializer=_init_worker,
+                                  initargs=(download_directory, cookies_path, driver_path, log_queue)) as pool:
+            for task, succeeded in pool.imap_unordered(_process_task, tasks):
+                if succeeded:
+                    manifest["done"].append(list(task))
+                    save_manifest(manifest, progress_path)
+            pool.close()
+            pool.join()
+
+        # Consolidate files for each state after all business types are processed
         for state in business_filtered_states:
-            safe_print(f"\nProcessing {state} with business type filtering...")
-            for business_type in business_types:
-                # Skip "Business Services" for Maharashtra
-                if state == "Maharashtra" and business_type == "Business Services":
-                    safe_print("Skipping Business Services for Maharashtra...")
-                    continue
-                    
-                try:
-                    driver.get("https://firstsource.cmie.com/kommon/bin/sr.php?kall=wadvsearch")
-                    time.sleep(2)
-                    download_and_process_data(driver, download_directory, state, business_type)
-                    safe_print(f"Completed processing {state} - {business_type}")
-                except Exception as e:
-                    safe_print(f"Error processing {state} - {business_type}: {e}")
-                    continue
-            
-            # Consolidate files for this state after all business types are processed
             safe_print(f"\nConsolidating files for {state}...")
             consolidate_state_files(download_directory, state)
 
-        # Process other states without business type filtering
-        for state in other_states:
-            safe_print(f"\nProcessing {state} without business type filtering...")
-            try:
-                driver.get("https://firstsource.cmie.com/kommon/bin/sr.php?kall=wadvsearch")
-                time.sleep(2)
-                download_and_process_data(driver, download_directory, state)
-                safe_print(f"Completed processing {state}")
-            except Exception as e:
-                safe_print(f"Error processing {state}: {e}")
-                continue
-
         safe_print("\nData collection and consolidation completed for all states.")
     except Exception as e:
         safe_print(f"An error occurred in main execution: {e}")
     finally:
-        input("Press Enter to close the browser...")
-        driver.quit()
+        listener.stop()
 
 
 if __name__ == "__main__":